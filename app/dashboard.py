@@ -11,24 +11,55 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
 from engine.agents import get_baseline_agents
-from engine.market_replay import run_league
+from engine.market_replay import LeagueResult, load_ohlcv_csv, run_league
 from engine.risk import RiskConfig
 
 
+@st.cache_data(show_spinner=False)
+def _cached_load(csv_path: str, mtime: float) -> pd.DataFrame:
+    return load_ohlcv_csv(csv_path)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_run_league(
+    csv_path: str,
+    mtime: float,
+    strategies: tuple[str, ...],
+    initial_capital: float,
+    slippage_bps: float,
+    fee_bps: float,
+    max_position_pct: float,
+    max_daily_dd_pct: float,
+) -> LeagueResult:
+    risk_config = RiskConfig(
+        max_position_pct=max_position_pct,
+        max_daily_drawdown_pct=max_daily_dd_pct,
+    )
+    return run_league(
+        strategies=list(strategies),
+        initial_capital=initial_capital,
+        slippage_bps=slippage_bps,
+        fee_bps=fee_bps,
+        risk_config=risk_config,
+        data=_cached_load(csv_path, mtime),
+    )
+
+
 def _format_leaderboard(leaderboard: pd.DataFrame) -> pd.DataFrame:
-    view = leaderboard.copy()
-    for col in ["total_return", "max_drawdown", "win_rate"]:
-        view[col] = (view[col] * 100.0).round(2)
-    view["sharpe"] = view["sharpe"].round(3)
-    view["final_equity"] = view["final_equity"].round(2)
-    view = view.rename(
+    view = leaderboard.assign(
+        total_return=(leaderboard["total_return"] * 100.0).round(2),
+        max_drawdown=(leaderboard["max_drawdown"] * 100.0).round(2),
+        win_rate=(leaderboard["win_rate"] * 100.0).round(2),
+        sharpe=leaderboard["sharpe"].round(3),
+        final_equity=leaderboard["final_equity"].round(2),
+    )
+    return view.rename(
         columns={
             "total_return": "total_return_%",
             "max_drawdown": "max_drawdown_%",
             "win_rate": "win_rate_%",
         }
     )
-    return view
 
 
 def main() -> None:
@@ -59,17 +90,15 @@ def main() -> None:
         return
 
     try:
-        risk_config = RiskConfig(
-            max_position_pct=float(max_position_pct),
-            max_daily_drawdown_pct=float(max_daily_dd_pct / 100.0),
-        )
-        league = run_league(
+        league = _cached_run_league(
             csv_path=csv_path,
-            strategies=selected,
+            mtime=Path(csv_path).stat().st_mtime,
+            strategies=tuple(selected),
             initial_capital=float(initial_capital),
             slippage_bps=float(slippage_bps),
             fee_bps=float(fee_bps),
-            risk_config=risk_config,
+            max_position_pct=float(max_position_pct),
+            max_daily_dd_pct=float(max_daily_dd_pct / 100.0),
         )
     except Exception as exc:
         st.error(f"Backtest failed: {exc}")
@@ -79,16 +108,14 @@ def main() -> None:
     st.dataframe(_format_leaderboard(league.leaderboard), use_container_width=True)
 
     st.subheader("Equity Curves")
-    chart_frames = []
-    for strategy, result in league.backtests.items():
-        frame = result.equity_curve[["timestamp", "equity"]].copy()
-        frame["strategy"] = strategy
-        chart_frames.append(frame)
-
-    if chart_frames:
-        chart_data = pd.concat(chart_frames, ignore_index=True)
-        pivot = chart_data.pivot(index="timestamp", columns="strategy", values="equity")
-        st.line_chart(pivot, use_container_width=True)
+    if league.backtests:
+        # Every strategy replays the same bars, so the curves share one timestamp index.
+        first_ts = next(iter(league.backtests.values())).equity_curve["timestamp"]
+        chart_data = pd.DataFrame(
+            {strategy: result.equity_curve["equity"].to_numpy() for strategy, result in league.backtests.items()},
+            index=pd.Index(first_ts, name="timestamp"),
+        )
+        st.line_chart(chart_data, use_container_width=True)
     else:
         st.warning("No equity data to plot.")
 
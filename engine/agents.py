@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import Callable, Dict
 
 import numpy as np
 import pandas as pd
 
+from engine.kernels import SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_SELL, rsi_wilder
+
 
 @dataclass(frozen=True)
 class Signal:
@@ -16,6 +18,18 @@ class Signal:
 HOLD_SIGNAL = Signal(action="hold", size=0.0)
 
 
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """O(N) trailing mean via a float64 cumulative sum; NaN until ``window`` bars are available."""
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    cumsum = np.empty(len(values) + 1)
+    cumsum[0] = 0.0
+    np.cumsum(values, out=cumsum[1:])
+    out[window - 1 :] = (cumsum[window:] - cumsum[:-window]) / window
+    return out
+
+
 class BaseAgent:
     name = "base"
 
@@ -29,9 +43,18 @@ class BaseAgent:
         """Pre-compute indicators using full history when needed."""
         self.data = data
 
-    def on_bar(self, index: int, row: pd.Series, position_qty: float) -> Signal:
+    def on_bar(self, index: int, close_price: float, position_qty: float) -> Signal:
         raise NotImplementedError
 
+    def compute_signals(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return the full (signals, sizes) stream for the replay kernel.
+
+        Signals use the codes in ``engine.kernels`` (hold/buy/sell) and are
+        position-agnostic: the kernel only buys while flat and only sells while
+        long. Returning ``None`` replays the agent bar by bar through ``on_bar``.
+        """
+        return None
+
 
 class BuyAndHoldAgent(BaseAgent):
     name = "buy_hold"
@@ -43,12 +66,18 @@ class BuyAndHoldAgent(BaseAgent):
     def reset(self) -> None:
         self.entered = False
 
-    def on_bar(self, index: int, row: pd.Series, position_qty: float) -> Signal:
+    def on_bar(self, index: int, close_price: float, position_qty: float) -> Signal:
         if not self.entered and position_qty <= 0:
             self.entered = True
             return Signal(action="buy", size=1.0)
         return HOLD_SIGNAL
 
+    def compute_signals(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        signals = np.full(len(data), SIGNAL_HOLD, dtype=np.int8)
+        if len(signals):
+            signals[0] = SIGNAL_BUY
+        return signals, np.ones(len(signals), dtype=np.float64)
+
 
 class SMACrossoverAgent(BaseAgent):
     name = "sma_crossover"
@@ -59,23 +88,23 @@ class SMACrossoverAgent(BaseAgent):
             raise ValueError("short_window must be less than long_window")
         self.short_window = short_window
         self.long_window = long_window
-        self.sma_short: pd.Series | None = None
-        self.sma_long: pd.Series | None = None
+        self.sma_short: np.ndarray | None = None
+        self.sma_long: np.ndarray | None = None
 
     def reset(self) -> None:
         return None
 
     def prepare(self, data: pd.DataFrame) -> None:
         super().prepare(data)
-        close = data["close"]
-        self.sma_short = close.rolling(self.short_window).mean()
-        self.sma_long = close.rolling(self.long_window).mean()
+        close = data["close"].to_numpy(np.float64)
+        self.sma_short = _rolling_mean(close, self.short_window)
+        self.sma_long = _rolling_mean(close, self.long_window)
 
-    def on_bar(self, index: int, row: pd.Series, position_qty: float) -> Signal:
+    def on_bar(self, index: int, close_price: float, position_qty: float) -> Signal:
         if self.sma_short is None or self.sma_long is None:
             return HOLD_SIGNAL
-        fast = self.sma_short.iloc[index]
-        slow = self.sma_long.iloc[index]
+        fast = self.sma_short[index]
+        slow = self.sma_long[index]
         if np.isnan(fast) or np.isnan(slow):
             return HOLD_SIGNAL
         if fast > slow and position_qty <= 0:
@@ -84,6 +113,13 @@ class SMACrossoverAgent(BaseAgent):
             return Signal(action="sell", size=1.0)
         return HOLD_SIGNAL
 
+    def compute_signals(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        if data is not self.data or self.sma_short is None or self.sma_long is None:
+            self.prepare(data)
+        fast, slow = self.sma_short, self.sma_long
+        signals = np.where(fast > slow, SIGNAL_BUY, np.where(fast < slow, SIGNAL_SELL, SIGNAL_HOLD)).astype(np.int8)
+        return signals, np.ones(len(signals), dtype=np.float64)
+
 
 class RSIMeanReversionAgent(BaseAgent):
     name = "rsi_mean_reversion"
@@ -102,27 +138,19 @@ class RSIMeanReversionAgent(BaseAgent):
         self.lower = lower
         self.upper = upper
         self.buy_size = buy_size
-        self.rsi: pd.Series | None = None
+        self.rsi: np.ndarray | None = None
 
     def reset(self) -> None:
         return None
 
     def prepare(self, data: pd.DataFrame) -> None:
         super().prepare(data)
-        close = data["close"]
-        delta = close.diff()
-        gains = delta.clip(lower=0.0)
-        losses = -delta.clip(upper=0.0)
-        avg_gain = gains.ewm(alpha=1 / self.period, adjust=False, min_periods=self.period).mean()
-        avg_loss = losses.ewm(alpha=1 / self.period, adjust=False, min_periods=self.period).mean()
-        rs = avg_gain / avg_loss.replace(0, np.nan)
-        rsi = 100 - (100 / (1 + rs))
-        self.rsi = rsi.fillna(50.0)
-
-    def on_bar(self, index: int, row: pd.Series, position_qty: float) -> Signal:
+        self.rsi = rsi_wilder(data["close"].to_numpy(), self.period)
+
+    def on_bar(self, index: int, close_price: float, position_qty: float) -> Signal:
         if self.rsi is None:
             return HOLD_SIGNAL
-        rsi_value = self.rsi.iloc[index]
+        rsi_value = self.rsi[index]
         if np.isnan(rsi_value):
             return HOLD_SIGNAL
         if rsi_value < self.lower and position_qty <= 0:
@@ -131,11 +159,18 @@ class RSIMeanReversionAgent(BaseAgent):
             return Signal(action="sell", size=1.0)
         return HOLD_SIGNAL
 
+    def compute_signals(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        if data is not self.data or self.rsi is None:
+            self.prepare(data)
+        signals = np.where(self.rsi < self.lower, SIGNAL_BUY, np.where(self.rsi > self.upper, SIGNAL_SELL, SIGNAL_HOLD)).astype(np.int8)
+        sizes = np.where(signals == SIGNAL_BUY, self.buy_size, 1.0)
+        return signals, sizes
 
-def get_baseline_agents() -> Dict[str, BaseAgent]:
+
+def get_baseline_agents() -> Dict[str, Callable[[], BaseAgent]]:
+    """Return agent factories keyed by strategy name; call one to get a fresh agent."""
     return {
-        BuyAndHoldAgent.name: BuyAndHoldAgent(),
-        SMACrossoverAgent.name: SMACrossoverAgent(),
-        RSIMeanReversionAgent.name: RSIMeanReversionAgent(),
+        BuyAndHoldAgent.name: BuyAndHoldAgent,
+        SMACrossoverAgent.name: SMACrossoverAgent,
+        RSIMeanReversionAgent.name: RSIMeanReversionAgent,
     }
-
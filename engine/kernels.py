@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = 2
+
+SIDE_BUY = 0
+SIDE_SELL = 1
+
+
+@njit(cache=True, nogil=True)
+def _replay_into(
+    close,
+    day_id,
+    signals,
+    sizes,
+    initial_capital,
+    slip,
+    fee,
+    max_pos_pct,
+    max_dd_pct,
+    min_notional,
+    trade_ts_idx,
+    trade_side,
+    trade_qty,
+    trade_fill,
+    trade_notional,
+    trade_fee,
+    trade_pnl,
+    trade_cash,
+    trade_pos,
+    equity,
+    cash_curve,
+    pos_curve,
+):
+    """Replay one signal stream into caller-provided buffers; returns the fill count."""
+    n = close.shape[0]
+
+    cash = float(initial_capital)
+    qty = 0.0
+    cost_basis = 0.0
+    day_start_eq = 0.0
+    current_day = 0
+    guard = False
+    n_trades = 0
+
+    for i in range(n):
+        price = float(close[i])
+        equity_before = cash + qty * price
+
+        # RiskManager.register_equity
+        if i == 0 or day_id[i] != current_day:
+            current_day = day_id[i]
+            day_start_eq = max(equity_before, 1e-9)
+            guard = False
+        elif (equity_before / day_start_eq) - 1.0 <= -max_dd_pct:
+            guard = True
+
+        sig = signals[i]
+        if sig == SIGNAL_BUY and qty <= 0 and not guard:
+            # RiskManager.size_buy_qty
+            frac = max(0.0, min(1.0, float(sizes[i])))
+            req_qty = 0.0
+            if price > 0 and cash > 0 and equity_before > 0 and frac != 0:
+                capacity = max(0.0, equity_before * max_pos_pct - qty * price)
+                target = min(equity_before * frac, capacity, cash)
+                if target >= min_notional:
+                    req_qty = target / price
+            # OrderEngine.execute_order (buy)
+            if req_qty > 0:
+                fill_price = price * (1.0 + slip)
+                affordable_qty = cash / (fill_price * (1.0 + fee))
+                fill_qty = min(req_qty, affordable_qty)
+                if fill_qty > 0:
+                    notional = fill_qty * fill_price
+                    fee_paid = notional * fee
+                    total_cost = notional + fee_paid
+                    cash -= total_cost
+                    qty += fill_qty
+                    cost_basis += total_cost
+
+                    trade_ts_idx[n_trades] = i
+                    trade_side[n_trades] = SIDE_BUY
+                    trade_qty[n_trades] = fill_qty
+                    trade_fill[n_trades] = fill_price
+                    trade_notional[n_trades] = notional
+                    trade_fee[n_trades] = fee_paid
+                    trade_pnl[n_trades] = 0.0
+                    trade_cash[n_trades] = cash
+                    trade_pos[n_trades] = qty
+                    n_trades += 1
+        elif sig == SIGNAL_SELL and qty > 0:
+            # RiskManager.size_sell_qty
+            frac = max(0.0, min(1.0, float(sizes[i])))
+            req_qty = qty * frac
+            # OrderEngine.execute_order (sell)
+            fill_qty = min(req_qty, qty)
+            if fill_qty > 0:
+                fill_price = price * (1.0 - slip)
+                notional = fill_qty * fill_price
+                fee_paid = notional * fee
+                proceeds = notional - fee_paid
+                avg_cost = cost_basis / qty
+                cost_released = avg_cost * fill_qty
+                cash += proceeds
+                qty -= fill_qty
+                cost_basis -= cost_released
+                if qty <= 1e-12:
+                    qty = 0.0
+                    cost_basis = 0.0
+
+                trade_ts_idx[n_trades] = i
+                trade_side[n_trades] = SIDE_SELL
+                trade_qty[n_trades] = fill_qty
+                trade_fill[n_trades] = fill_price
+                trade_notional[n_trades] = notional
+                trade_fee[n_trades] = fee_paid
+                trade_pnl[n_trades] = proceeds - cost_released
+                trade_cash[n_trades] = cash
+                trade_pos[n_trades] = qty
+                n_trades += 1
+
+        # OrderEngine.mark_to_market
+        equity[i] = cash + qty * price
+        cash_curve[i] = cash
+        pos_curve[i] = qty
+
+    return n_trades
+
+
+@njit(cache=True, nogil=True)
+def replay(
+    close,
+    day_id,
+    signals,
+    sizes,
+    initial_capital,
+    slip,
+    fee,
+    max_pos_pct,
+    max_dd_pct,
+    min_notional,
+):
+    """Replay a precomputed signal stream with OrderEngine/RiskManager semantics.
+
+    Buys are only taken while flat and sells only while long. Returns the
+    trade columns (trimmed to the number of fills) followed by the per-bar
+    equity, cash and position columns.
+    """
+    n = close.shape[0]
+
+    trade_ts_idx = np.empty(n, dtype=np.int64)
+    trade_side = np.empty(n, dtype=np.int8)
+    trade_qty = np.empty(n, dtype=np.float64)
+    trade_fill = np.empty(n, dtype=np.float64)
+    trade_notional = np.empty(n, dtype=np.float64)
+    trade_fee = np.empty(n, dtype=np.float64)
+    trade_pnl = np.empty(n, dtype=np.float64)
+    trade_cash = np.empty(n, dtype=np.float64)
+    trade_pos = np.empty(n, dtype=np.float64)
+
+    equity = np.empty(n, dtype=np.float64)
+    cash_curve = np.empty(n, dtype=np.float64)
+    pos_curve = np.empty(n, dtype=np.float64)
+
+    n_trades = _replay_into(
+        close,
+        day_id,
+        signals,
+        sizes,
+        initial_capital,
+        slip,
+        fee,
+        max_pos_pct,
+        max_dd_pct,
+        min_notional,
+        trade_ts_idx,
+        trade_side,
+        trade_qty,
+        trade_fill,
+        trade_notional,
+        trade_fee,
+        trade_pnl,
+        trade_cash,
+        trade_pos,
+        equity,
+        cash_curve,
+        pos_curve,
+    )
+
+    return (
+        trade_ts_idx[:n_trades],
+        trade_side[:n_trades],
+        trade_qty[:n_trades],
+        trade_fill[:n_trades],
+        trade_notional[:n_trades],
+        trade_fee[:n_trades],
+        trade_pnl[:n_trades],
+        trade_cash[:n_trades],
+        trade_pos[:n_trades],
+        equity,
+        cash_curve,
+        pos_curve,
+    )
+
+
+@njit(cache=True, parallel=True)
+def replay_multi(
+    close,
+    day_id,
+    signals,
+    sizes,
+    initial_capital,
+    slip,
+    fee,
+    max_pos_pct,
+    max_dd_pct,
+    min_notional,
+):
+    """Replay K signal streams of shape ``(K, N)`` against one shared price array.
+
+    Strategies are independent, so rows run in parallel. Returns ``(K, N)``
+    trade buffers with per-row fill counts, then ``(K, N)`` equity, cash and
+    position curves.
+    """
+    k_count, n = signals.shape
+
+    trade_ts_idx = np.empty((k_count, n), dtype=np.int64)
+    trade_side = np.empty((k_count, n), dtype=np.int8)
+    trade_qty = np.empty((k_count, n), dtype=np.float64)
+    trade_fill = np.empty((k_count, n), dtype=np.float64)
+    trade_notional = np.empty((k_count, n), dtype=np.float64)
+    trade_fee = np.empty((k_count, n), dtype=np.float64)
+    trade_pnl = np.empty((k_count, n), dtype=np.float64)
+    trade_cash = np.empty((k_count, n), dtype=np.float64)
+    trade_pos = np.empty((k_count, n), dtype=np.float64)
+    n_trades = np.zeros(k_count, dtype=np.int64)
+
+    equity = np.empty((k_count, n), dtype=np.float64)
+    cash_curve = np.empty((k_count, n), dtype=np.float64)
+    pos_curve = np.empty((k_count, n), dtype=np.float64)
+
+    for k in prange(k_count):
+        n_trades[k] = _replay_into(
+            close,
+            day_id,
+            signals[k],
+            sizes[k],
+            initial_capital,
+            slip,
+            fee,
+            max_pos_pct,
+            max_dd_pct,
+            min_notional,
+            trade_ts_idx[k],
+            trade_side[k],
+            trade_qty[k],
+            trade_fill[k],
+            trade_notional[k],
+            trade_fee[k],
+            trade_pnl[k],
+            trade_cash[k],
+            trade_pos[k],
+            equity[k],
+            cash_curve[k],
+            pos_curve[k],
+        )
+
+    return (
+        trade_ts_idx,
+        trade_side,
+        trade_qty,
+        trade_fill,
+        trade_notional,
+        trade_fee,
+        trade_pnl,
+        trade_cash,
+        trade_pos,
+        n_trades,
+        equity,
+        cash_curve,
+        pos_curve,
+    )
+
+
+@njit(cache=True)
+def rsi_wilder(close, period):
+    """Wilder RSI in one fused sweep over ``close``.
+
+    Matches ``ewm(alpha=1/period, adjust=False, min_periods=period)`` on the
+    clipped price deltas: averages are seeded from the first delta, values are
+    NaN during warm-up and wherever the average loss is zero.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    alpha = 1.0 / period
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if i == 1:
+            avg_gain = gain
+            avg_loss = loss
+        else:
+            avg_gain = (1.0 - alpha) * avg_gain + alpha * gain
+            avg_loss = (1.0 - alpha) * avg_loss + alpha * loss
+        if i >= period and avg_loss > 0:
+            out[i] = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+    return out
+
+
+@njit(cache=True)
+def equity_metrics(equity):
+    """Single pass over an equity curve.
+
+    Returns ``(min_drawdown, return_sum, return_sumsq, n_returns)`` where the
+    drawdown is measured against the running peak and bar returns skip bars
+    whose previous equity is zero (as ``pct_change`` + dropping inf/NaN does).
+    """
+    peak = equity[0]
+    min_drawdown = 0.0
+    return_sum = 0.0
+    return_sumsq = 0.0
+    n_returns = 0
+    prev = equity[0]
+    for i in range(1, equity.shape[0]):
+        x = equity[i]
+        if x > peak:
+            peak = x
+        drawdown = (x / peak) - 1.0
+        if drawdown < min_drawdown:
+            min_drawdown = drawdown
+        if prev != 0.0:
+            r = (x / prev) - 1.0
+            return_sum += r
+            return_sumsq += r * r
+            n_returns += 1
+        prev = x
+    return min_drawdown, return_sum, return_sumsq, n_returns
@@ -4,17 +4,23 @@ import argparse
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+from joblib import Parallel, delayed
 
 from engine.agents import BaseAgent, get_baseline_agents
+from engine.kernels import SIDE_BUY, equity_metrics, replay, replay_multi
 from engine.order_engine import OrderEngine
 from engine.risk import RiskConfig, RiskManager
 
 
 REQUIRED_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "volume"]
 
 
 @dataclass
@@ -32,19 +38,36 @@ class LeagueResult:
 
 
 def load_ohlcv_csv(csv_path: str | Path) -> pd.DataFrame:
-    data = pd.read_csv(csv_path)
-    missing = [col for col in REQUIRED_COLUMNS if col not in data.columns]
+    # Prices and volume are parsed as float32; portfolio accounting stays in float64.
+    column_types = {col: pa.float32() for col in NUMERIC_COLUMNS}
+    column_types["timestamp"] = pa.string()
+    convert_options = pcsv.ConvertOptions(column_types=column_types)
+    try:
+        table = pcsv.read_csv(
+            csv_path,
+            read_options=pcsv.ReadOptions(use_threads=True),
+            convert_options=convert_options,
+        )
+    except pa.ArrowInvalid as exc:
+        raise ValueError(f"CSV contains invalid values: {exc}") from exc
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in table.column_names]
     if missing:
         raise ValueError(f"CSV is missing required columns: {missing}")
 
-    frame = data[REQUIRED_COLUMNS].copy()
-    frame["timestamp"] = pd.to_datetime(frame["timestamp"], errors="coerce")
+    frame = table.select(NUMERIC_COLUMNS).to_pandas()
+    raw_timestamps = table.column("timestamp")
+    try:
+        timestamps = pc.cast(raw_timestamps, pa.timestamp("ns")).to_pandas()
+    except pa.ArrowInvalid:
+        # Arrow only parses naive ISO-8601 here; offsets (which it would fold into UTC)
+        # and other formats go through pandas so the source timezone is kept.
+        timestamps = pd.to_datetime(raw_timestamps.to_pandas(), errors="coerce")
+    frame.insert(0, "timestamp", timestamps)
     if frame["timestamp"].isna().any():
         raise ValueError("timestamp column contains invalid values")
 
-    numeric_cols = ["open", "high", "low", "close", "volume"]
-    for col in numeric_cols:
-        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    for col in NUMERIC_COLUMNS:
         if frame[col].isna().any():
             raise ValueError(f"column '{col}' contains invalid numeric values")
 
@@ -61,25 +84,25 @@ def compute_metrics(equity_curve: pd.DataFrame, trades: pd.DataFrame, initial_ca
             "win_rate": 0.0,
         }
 
-    equity = equity_curve["equity"].astype(float)
-    final_equity = float(equity.iloc[-1])
+    equity = equity_curve["equity"].to_numpy(np.float64)
+    final_equity = float(equity[-1])
     total_return = (final_equity / initial_capital) - 1.0
 
-    rolling_peak = equity.cummax()
-    drawdown = (equity / rolling_peak) - 1.0
-    max_drawdown = abs(float(drawdown.min()))
+    min_drawdown, return_sum, return_sumsq, n_returns = equity_metrics(equity)
+    max_drawdown = abs(float(min_drawdown))
 
-    returns = equity.pct_change().replace([np.inf, -np.inf], np.nan).dropna()
-    if returns.empty or np.isclose(returns.std(ddof=0), 0.0):
+    if n_returns == 0:
         sharpe = 0.0
     else:
-        sharpe = float(np.sqrt(252) * returns.mean() / returns.std(ddof=0))
+        mean_return = return_sum / n_returns
+        std_return = np.sqrt(max(return_sumsq / n_returns - mean_return * mean_return, 0.0))
+        sharpe = 0.0 if np.isclose(std_return, 0.0) else float(np.sqrt(252) * mean_return / std_return)
 
-    closed_trades = trades[trades["side"] == "sell"] if not trades.empty else pd.DataFrame()
-    if closed_trades.empty:
+    is_close = trades["side"].to_numpy() == "sell" if not trades.empty else np.zeros(0, dtype=bool)
+    if not is_close.any():
         win_rate = 0.0
     else:
-        win_rate = float((closed_trades["realized_pnl"] > 0).mean())
+        win_rate = float((trades["realized_pnl"].to_numpy(np.float64)[is_close] > 0).mean())
 
     return {
         "total_return": float(total_return),
@@ -89,6 +112,102 @@ def compute_metrics(equity_curve: pd.DataFrame, trades: pd.DataFrame, initial_ca
     }
 
 
+def _bar_arrays(data: pd.DataFrame) -> tuple[pd.arrays.DatetimeArray, np.ndarray, np.ndarray]:
+    timestamps = pd.to_datetime(data["timestamp"]).dt.as_unit("ns")
+    close = data["close"].to_numpy()
+    if close.dtype != np.float32:
+        close = close.astype(np.float64, copy=False)
+    # Days split at local midnight, like pd.Timestamp.normalize(), not at UTC midnight.
+    wall_clock = timestamps.dt.tz_localize(None) if timestamps.dt.tz is not None else timestamps
+    day_id = wall_clock.to_numpy().astype("datetime64[D]").view(np.int64)
+    return timestamps.array, close, day_id
+
+
+def _replay_frames(
+    timestamps: pd.arrays.DatetimeArray,
+    close: np.ndarray,
+    trade_idx: np.ndarray,
+    trade_side: np.ndarray,
+    trade_qty: np.ndarray,
+    trade_fill: np.ndarray,
+    trade_notional: np.ndarray,
+    trade_fee: np.ndarray,
+    trade_pnl: np.ndarray,
+    trade_cash: np.ndarray,
+    trade_pos: np.ndarray,
+    equity: np.ndarray,
+    cash: np.ndarray,
+    position_qty: np.ndarray,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    trades = pd.DataFrame(
+        {
+            "timestamp": timestamps[trade_idx],
+            "side": np.where(trade_side == SIDE_BUY, "buy", "sell"),
+            "qty": trade_qty,
+            "fill_price": trade_fill,
+            "notional": trade_notional,
+            "fee": trade_fee,
+            "realized_pnl": trade_pnl,
+            "cash_after": trade_cash,
+            "position_after": trade_pos,
+        }
+    )
+    equity_curve = pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "equity": equity,
+            "cash": cash,
+            "position_qty": position_qty,
+            # The kernel reads float32 CSV prices as-is; report them as float64 like the per-bar loop.
+            "close": close.astype(np.float64, copy=False),
+        }
+    )
+    return trades, equity_curve
+
+
+def _replay_signals(
+    data: pd.DataFrame,
+    signals: np.ndarray,
+    sizes: np.ndarray,
+    order_engine: OrderEngine,
+    risk_manager: RiskManager,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    if len(signals) != len(data) or len(sizes) != len(data):
+        raise ValueError("signals and sizes must have one entry per bar")
+
+    timestamps, close, day_id = _bar_arrays(data)
+    outputs = replay(
+        close,
+        day_id,
+        np.ascontiguousarray(signals, dtype=np.int8),
+        np.ascontiguousarray(sizes, dtype=np.float64),
+        order_engine.initial_capital,
+        order_engine.slippage_rate,
+        order_engine.fee_rate,
+        risk_manager._max_pos,
+        risk_manager._max_dd,
+        risk_manager._min_notional,
+    )
+    return _replay_frames(timestamps, close, *outputs)
+
+
+def _build_leaderboard(backtests: Dict[str, BacktestResult], initial_capital: float) -> pd.DataFrame:
+    leaderboard_rows: List[Dict[str, float | str]] = []
+    for strategy, result in backtests.items():
+        final_equity = float(result.equity_curve["equity"].iloc[-1]) if not result.equity_curve.empty else initial_capital
+        leaderboard_rows.append(
+            {
+                "strategy": strategy,
+                "final_equity": final_equity,
+                "total_return": result.metrics["total_return"],
+                "max_drawdown": result.metrics["max_drawdown"],
+                "sharpe": result.metrics["sharpe"],
+                "win_rate": result.metrics["win_rate"],
+            }
+        )
+    return pd.DataFrame(leaderboard_rows).sort_values("total_return", ascending=False).reset_index(drop=True)
+
+
 def run_backtest(
     data: pd.DataFrame,
     agent: BaseAgent,
@@ -107,13 +226,30 @@ def run_backtest(
     agent.reset()
     agent.prepare(data)
 
-    for i, row in data.iterrows():
-        timestamp = pd.Timestamp(row["timestamp"])
-        close_price = float(row["close"])
+    vectorized = agent.compute_signals(data)
+    if vectorized is not None:
+        signals, sizes = vectorized
+        trades, equity_curve = _replay_signals(data, signals, sizes, order_engine, risk_manager)
+        metrics = compute_metrics(equity_curve, trades, initial_capital)
+        return BacktestResult(
+            strategy=agent.name,
+            trades=trades,
+            equity_curve=equity_curve,
+            metrics=metrics,
+        )
+
+    timestamps, close, day_ids = _bar_arrays(data)
+    order_engine.tz = timestamps.tz
+    # Naive datetime64 (UTC instants when tz-aware) avoids a pd.Timestamp per bar.
+    bar_times = (timestamps.tz_convert(None) if timestamps.tz is not None else timestamps).to_numpy()
+    order_engine.reserve(len(data))
+    for i in range(len(data)):
+        timestamp = bar_times[i]
+        close_price = float(close[i])
         equity_before = order_engine.total_equity(close_price)
-        risk_manager.register_equity(timestamp, equity_before)
+        risk_manager.register_equity_fast(int(day_ids[i]), equity_before)
 
-        signal = agent.on_bar(i, row, order_engine.position_qty)
+        signal = agent.on_bar(i, close_price, order_engine.position_qty)
         action = signal.action.lower()
 
         if action == "buy" and risk_manager.can_add_risk():
@@ -124,13 +260,13 @@ def run_backtest(
                 equity=equity_before,
                 current_position_qty=order_engine.position_qty,
             )
-            order_engine.execute_order(timestamp, "buy", qty, close_price)
+            order_engine._execute_buy(timestamp, qty, close_price)
         elif action == "sell":
             qty = risk_manager.size_sell_qty(
                 requested_fraction=signal.size,
                 current_position_qty=order_engine.position_qty,
             )
-            order_engine.execute_order(timestamp, "sell", qty, close_price)
+            order_engine._execute_sell(timestamp, qty, close_price)
 
         order_engine.mark_to_market(timestamp, close_price)
 
@@ -147,14 +283,19 @@ def run_backtest(
 
 
 def run_league(
-    csv_path: str | Path,
+    csv_path: str | Path | None = None,
     strategies: Iterable[str] | None = None,
     initial_capital: float = 10_000.0,
     slippage_bps: float = 2.0,
     fee_bps: float = 5.0,
     risk_config: RiskConfig | None = None,
+    n_jobs: int = 1,
+    data: pd.DataFrame | None = None,
 ) -> LeagueResult:
-    data = load_ohlcv_csv(csv_path)
+    if data is None:
+        if csv_path is None:
+            raise ValueError("Either csv_path or data must be provided")
+        data = load_ohlcv_csv(csv_path)
     available = get_baseline_agents()
 
     selected = list(strategies) if strategies else list(available.keys())
@@ -162,34 +303,118 @@ def run_league(
     if unknown:
         raise ValueError(f"Unknown strategy name(s): {unknown}. Available: {list(available.keys())}")
 
-    backtests: Dict[str, BacktestResult] = {}
-    leaderboard_rows: List[Dict[str, float | str]] = []
-
-    for strategy in selected:
-        result = run_backtest(
-            data=data,
-            agent=available[strategy],
-            initial_capital=initial_capital,
-            slippage_bps=slippage_bps,
-            fee_bps=fee_bps,
-            risk_config=risk_config,
+    backtest_kwargs = {
+        "initial_capital": initial_capital,
+        "slippage_bps": slippage_bps,
+        "fee_bps": fee_bps,
+        "risk_config": risk_config,
+    }
+    # Kernel backtests finish in milliseconds, so a process pool is opt-in: its startup
+    # only pays off for very long histories or per-bar (on_bar-only) agents.
+    if len(selected) == 1 or n_jobs == 1:
+        results = [run_backtest(data=data, agent=available[strategy](), **backtest_kwargs) for strategy in selected]
+    else:
+        results = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(run_backtest)(data=data, agent=available[strategy](), **backtest_kwargs) for strategy in selected
         )
-        backtests[strategy] = result
 
-        final_equity = float(result.equity_curve["equity"].iloc[-1]) if not result.equity_curve.empty else initial_capital
-        leaderboard_rows.append(
-            {
-                "strategy": strategy,
-                "final_equity": final_equity,
-                "total_return": result.metrics["total_return"],
-                "max_drawdown": result.metrics["max_drawdown"],
-                "sharpe": result.metrics["sharpe"],
-                "win_rate": result.metrics["win_rate"],
-            }
-        )
+    backtests = dict(zip(selected, results))
+    return LeagueResult(leaderboard=_build_leaderboard(backtests, initial_capital), backtests=backtests)
+
+
+def run_league_vec(
+    data: pd.DataFrame,
+    agents: Dict[str, Callable[[], BaseAgent]],
+    initial_capital: float = 10_000.0,
+    slippage_bps: float = 2.0,
+    fee_bps: float = 5.0,
+    risk_config: RiskConfig | None = None,
+) -> LeagueResult:
+    """Replay every agent in one batched kernel pass over a shared price array.
+
+    ``agents`` maps strategy names to factories, as returned by
+    ``get_baseline_agents``; a fresh agent is built for each. All agents must
+    provide ``compute_signals``; per-bar ``on_bar`` agents should go through
+    ``run_league`` instead.
+    """
+    if not agents:
+        raise ValueError("agents must contain at least one strategy")
+    order_engine = OrderEngine(
+        initial_capital=initial_capital,
+        slippage_bps=slippage_bps,
+        fee_bps=fee_bps,
+    )
+    risk_manager = RiskManager(risk_config)
+    timestamps, close, day_id = _bar_arrays(data)
+
+    names = list(agents.keys())
+    instances = {name: agents[name]() for name in names}
+    signals = np.zeros((len(names), len(data)), dtype=np.int8)
+    sizes = np.zeros((len(names), len(data)), dtype=np.float64)
+    for k, name in enumerate(names):
+        agent = instances[name]
+        agent.reset()
+        agent.prepare(data)
+        vectorized = agent.compute_signals(data)
+        if vectorized is None:
+            raise ValueError(f"Agent '{name}' does not provide vectorized signals")
+        if len(vectorized[0]) != len(data) or len(vectorized[1]) != len(data):
+            raise ValueError("signals and sizes must have one entry per bar")
+        signals[k], sizes[k] = vectorized
+
+    (
+        trade_idx,
+        trade_side,
+        trade_qty,
+        trade_fill,
+        trade_notional,
+        trade_fee,
+        trade_pnl,
+        trade_cash,
+        trade_pos,
+        n_trades,
+        equity,
+        cash,
+        position_qty,
+    ) = replay_multi(
+        close,
+        day_id,
+        signals,
+        sizes,
+        order_engine.initial_capital,
+        order_engine.slippage_rate,
+        order_engine.fee_rate,
+        risk_manager._max_pos,
+        risk_manager._max_dd,
+        risk_manager._min_notional,
+    )
 
-    leaderboard = pd.DataFrame(leaderboard_rows).sort_values("total_return", ascending=False).reset_index(drop=True)
-    return LeagueResult(leaderboard=leaderboard, backtests=backtests)
+    backtests: Dict[str, BacktestResult] = {}
+    for k, name in enumerate(names):
+        m = n_trades[k]
+        trades, equity_curve = _replay_frames(
+            timestamps,
+            close,
+            trade_idx[k, :m],
+            trade_side[k, :m],
+            trade_qty[k, :m],
+            trade_fill[k, :m],
+            trade_notional[k, :m],
+            trade_fee[k, :m],
+            trade_pnl[k, :m],
+            trade_cash[k, :m],
+            trade_pos[k, :m],
+            equity[k],
+            cash[k],
+            position_qty[k],
+        )
+        backtests[name] = BacktestResult(
+            strategy=instances[name].name,
+            trades=trades,
+            equity_curve=equity_curve,
+            metrics=compute_metrics(equity_curve, trades, initial_capital),
+        )
+    return LeagueResult(leaderboard=_build_leaderboard(backtests, initial_capital), backtests=backtests)
 
 
 def save_league_results(result: LeagueResult, output_dir: str | Path, run_tag: str | None = None) -> Dict[str, str]:
@@ -205,10 +430,10 @@ def save_league_results(result: LeagueResult, output_dir: str | Path, run_tag: s
 
     for strategy, backtest in result.backtests.items():
         safe_name = strategy.replace(" ", "_")
-        trades_path = output_path / f"{run_id}_{safe_name}_trades.csv"
-        equity_path = output_path / f"{run_id}_{safe_name}_equity.csv"
-        backtest.trades.to_csv(trades_path, index=False)
-        backtest.equity_curve.to_csv(equity_path, index=False)
+        trades_path = output_path / f"{run_id}_{safe_name}_trades.parquet"
+        equity_path = output_path / f"{run_id}_{safe_name}_equity.parquet"
+        backtest.trades.to_parquet(trades_path, engine="pyarrow", compression="snappy", index=False)
+        backtest.equity_curve.to_parquet(equity_path, engine="pyarrow", compression="snappy", index=False)
         artifact_paths[f"{strategy}_trades"] = str(trades_path)
         artifact_paths[f"{strategy}_equity"] = str(equity_path)
 
@@ -229,6 +454,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--fee-bps", type=float, default=5.0, help="Fee in bps")
     parser.add_argument("--max-position-pct", type=float, default=1.0, help="Maximum position as pct of equity")
     parser.add_argument("--max-daily-drawdown-pct", type=float, default=0.05, help="Daily drawdown cutoff")
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Worker processes for per-strategy backtests (1 runs serially, -1 uses all cores)",
+    )
     parser.add_argument("--output-dir", default="results", help="Directory for result artifacts")
     parser.add_argument("--run-tag", default=None, help="Optional run tag for output filenames")
     return parser.parse_args()
@@ -247,6 +478,7 @@ def main() -> None:
         slippage_bps=args.slippage_bps,
         fee_bps=args.fee_bps,
         risk_config=risk_config,
+        n_jobs=args.n_jobs,
     )
     artifacts = save_league_results(league, output_dir=args.output_dir, run_tag=args.run_tag)
 
@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
+from datetime import tzinfo
 from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
+from engine.kernels import SIDE_BUY, SIDE_SELL
+
+
+_EQUITY_BUFFERS = ("_eq_ts", "_eq_equity", "_eq_cash", "_eq_pos", "_eq_close")
+_TRADE_BUFFERS = (
+    "_tr_ts",
+    "_tr_side",
+    "_tr_qty",
+    "_tr_fill",
+    "_tr_notional",
+    "_tr_fee",
+    "_tr_pnl",
+    "_tr_cash",
+    "_tr_pos",
+)
+
 
 @dataclass
 class Trade:
-    timestamp: pd.Timestamp
+    timestamp: pd.Timestamp | np.datetime64
     side: str
     qty: float
     fill_price: float
@@ -22,7 +40,13 @@ class Trade:
 class OrderEngine:
     """Long-only order engine with slippage, fees, and portfolio tracking."""
 
-    def __init__(self, initial_capital: float, slippage_bps: float = 2.0, fee_bps: float = 5.0) -> None:
+    def __init__(
+        self,
+        initial_capital: float,
+        slippage_bps: float = 2.0,
+        fee_bps: float = 5.0,
+        tz: tzinfo | str | None = None,
+    ) -> None:
         if initial_capital <= 0:
             raise ValueError("initial_capital must be positive")
         self.initial_capital = float(initial_capital)
@@ -31,8 +55,72 @@ class OrderEngine:
         self.position_cost_basis = 0.0
         self.slippage_bps = float(slippage_bps)
         self.fee_bps = float(fee_bps)
-        self.trades: List[Trade] = []
-        self.equity_points: List[Dict[str, float | pd.Timestamp]] = []
+        # Timestamps are buffered as int64 ns: UTC instants when ``tz`` is set (naive
+        # datetime64 inputs are then read as UTC), wall-clock time otherwise.
+        self.tz = tz
+        self._eq_ts = np.empty(0, dtype=np.int64)
+        self._eq_equity = np.empty(0)
+        self._eq_cash = np.empty(0)
+        self._eq_pos = np.empty(0)
+        self._eq_close = np.empty(0)
+        self._eq_i = 0
+        self._tr_ts = np.empty(0, dtype=np.int64)
+        self._tr_side = np.empty(0, dtype=np.int8)
+        self._tr_qty = np.empty(0)
+        self._tr_fill = np.empty(0)
+        self._tr_notional = np.empty(0)
+        self._tr_fee = np.empty(0)
+        self._tr_pnl = np.empty(0)
+        self._tr_cash = np.empty(0)
+        self._tr_pos = np.empty(0)
+        self._tr_i = 0
+
+    def reserve(self, n: int) -> None:
+        """Size the equity-curve buffers for ``n`` bars so mark_to_market never reallocates."""
+        if n > len(self._eq_equity):
+            self._resize_buffers(_EQUITY_BUFFERS, self._eq_i, n)
+
+    def _resize_buffers(self, attrs: tuple[str, ...], filled: int, capacity: int) -> None:
+        for attr in attrs:
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:filled] = old[:filled]
+            setattr(self, attr, new)
+
+    def _to_ns(self, timestamp: pd.Timestamp | np.datetime64) -> int:
+        if isinstance(timestamp, np.datetime64):
+            return int(timestamp.astype("datetime64[ns]").astype(np.int64))
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None and self.tz is None:
+            self.tz = timestamp.tzinfo
+        return timestamp.value
+
+    def _timestamps(self, ns: np.ndarray) -> pd.arrays.DatetimeArray:
+        timestamps = pd.DatetimeIndex(ns.view("datetime64[ns]"))
+        if self.tz is not None:
+            timestamps = timestamps.tz_localize("UTC").tz_convert(self.tz)
+        return timestamps.array
+
+    def _trade_at(self, i: int) -> Trade:
+        return Trade(
+            timestamp=self._timestamps(self._tr_ts[i : i + 1])[0],
+            side="buy" if self._tr_side[i] == SIDE_BUY else "sell",
+            qty=float(self._tr_qty[i]),
+            fill_price=float(self._tr_fill[i]),
+            notional=float(self._tr_notional[i]),
+            fee=float(self._tr_fee[i]),
+            realized_pnl=float(self._tr_pnl[i]),
+            cash_after=float(self._tr_cash[i]),
+            position_after=float(self._tr_pos[i]),
+        )
+
+    @property
+    def trades(self) -> List[Trade]:
+        return [self._trade_at(i) for i in range(self._tr_i)]
+
+    @property
+    def equity_points(self) -> List[Dict[str, float | pd.Timestamp]]:
+        return self.equity_frame().to_dict("records")
 
     @property
     def fee_rate(self) -> float:
@@ -45,90 +133,116 @@ class OrderEngine:
     def total_equity(self, mark_price: float) -> float:
         return self.cash + (self.position_qty * mark_price)
 
-    def mark_to_market(self, timestamp: pd.Timestamp, close_price: float) -> float:
+    def mark_to_market(self, timestamp: pd.Timestamp | np.datetime64, close_price: float) -> float:
         equity = self.total_equity(close_price)
-        self.equity_points.append(
-            {
-                "timestamp": timestamp,
-                "equity": equity,
-                "cash": self.cash,
-                "position_qty": self.position_qty,
-                "close": close_price,
-            }
-        )
+        i = self._eq_i
+        if i == len(self._eq_equity):
+            self._resize_buffers(_EQUITY_BUFFERS, i, max(64, 2 * i))
+        self._eq_ts[i] = self._to_ns(timestamp)
+        self._eq_equity[i] = equity
+        self._eq_cash[i] = self.cash
+        self._eq_pos[i] = self.position_qty
+        self._eq_close[i] = close_price
+        self._eq_i = i + 1
         return equity
 
-    def execute_order(self, timestamp: pd.Timestamp, side: str, qty: float, price: float) -> Trade | None:
+    def execute_order(self, timestamp: pd.Timestamp | np.datetime64, side: str, qty: float, price: float) -> Trade | None:
         if qty <= 0:
             return None
         side = side.lower()
         if side not in {"buy", "sell"}:
             raise ValueError(f"Unsupported side: {side}")
+        filled = self._execute_buy(timestamp, qty, price) if side == "buy" else self._execute_sell(timestamp, qty, price)
+        return self._trade_at(self._tr_i - 1) if filled else None
 
-        if side == "buy":
-            fill_price = price * (1.0 + self.slippage_rate)
-            affordable_qty = self.cash / (fill_price * (1.0 + self.fee_rate))
-            trade_qty = min(qty, affordable_qty)
-            if trade_qty <= 0:
-                return None
-            notional = trade_qty * fill_price
-            fee = notional * self.fee_rate
-            total_cost = notional + fee
-            self.cash -= total_cost
-            self.position_qty += trade_qty
-            self.position_cost_basis += total_cost
-            realized_pnl = 0.0
-        else:
-            trade_qty = min(qty, self.position_qty)
-            if trade_qty <= 0:
-                return None
-            fill_price = price * (1.0 - self.slippage_rate)
-            notional = trade_qty * fill_price
-            fee = notional * self.fee_rate
-            proceeds = notional - fee
-            avg_cost = self.position_cost_basis / self.position_qty if self.position_qty > 0 else 0.0
-            cost_released = avg_cost * trade_qty
-            realized_pnl = proceeds - cost_released
-            self.cash += proceeds
-            self.position_qty -= trade_qty
-            self.position_cost_basis -= cost_released
-            if self.position_qty <= 1e-12:
-                self.position_qty = 0.0
-                self.position_cost_basis = 0.0
-
-        trade = Trade(
-            timestamp=timestamp,
-            side=side,
-            qty=trade_qty,
-            fill_price=fill_price,
-            notional=notional,
-            fee=fee,
-            realized_pnl=realized_pnl,
-            cash_after=self.cash,
-            position_after=self.position_qty,
-        )
-        self.trades.append(trade)
-        return trade
+    def _execute_buy(self, timestamp: pd.Timestamp | np.datetime64, qty: float, price: float) -> bool:
+        if qty <= 0:
+            return False
+        fill_price = price * (1.0 + self.slippage_rate)
+        affordable_qty = self.cash / (fill_price * (1.0 + self.fee_rate))
+        trade_qty = min(qty, affordable_qty)
+        if trade_qty <= 0:
+            return False
+        notional = trade_qty * fill_price
+        fee = notional * self.fee_rate
+        total_cost = notional + fee
+        self.cash -= total_cost
+        self.position_qty += trade_qty
+        self.position_cost_basis += total_cost
+        self._record_trade(timestamp, SIDE_BUY, trade_qty, fill_price, notional, fee, 0.0)
+        return True
+
+    def _execute_sell(self, timestamp: pd.Timestamp | np.datetime64, qty: float, price: float) -> bool:
+        if qty <= 0:
+            return False
+        trade_qty = min(qty, self.position_qty)
+        if trade_qty <= 0:
+            return False
+        fill_price = price * (1.0 - self.slippage_rate)
+        notional = trade_qty * fill_price
+        fee = notional * self.fee_rate
+        proceeds = notional - fee
+        avg_cost = self.position_cost_basis / self.position_qty if self.position_qty > 0 else 0.0
+        cost_released = avg_cost * trade_qty
+        realized_pnl = proceeds - cost_released
+        self.cash += proceeds
+        self.position_qty -= trade_qty
+        self.position_cost_basis -= cost_released
+        if self.position_qty <= 1e-12:
+            self.position_qty = 0.0
+            self.position_cost_basis = 0.0
+        self._record_trade(timestamp, SIDE_SELL, trade_qty, fill_price, notional, fee, realized_pnl)
+        return True
+
+    def _record_trade(
+        self,
+        timestamp: pd.Timestamp | np.datetime64,
+        side: int,
+        qty: float,
+        fill_price: float,
+        notional: float,
+        fee: float,
+        realized_pnl: float,
+    ) -> None:
+        i = self._tr_i
+        if i == len(self._tr_qty):
+            self._resize_buffers(_TRADE_BUFFERS, i, max(16, 2 * i))
+        self._tr_ts[i] = self._to_ns(timestamp)
+        self._tr_side[i] = side
+        self._tr_qty[i] = qty
+        self._tr_fill[i] = fill_price
+        self._tr_notional[i] = notional
+        self._tr_fee[i] = fee
+        self._tr_pnl[i] = realized_pnl
+        self._tr_cash[i] = self.cash
+        self._tr_pos[i] = self.position_qty
+        self._tr_i = i + 1
 
     def trades_frame(self) -> pd.DataFrame:
-        if not self.trades:
-            return pd.DataFrame(
-                columns=[
-                    "timestamp",
-                    "side",
-                    "qty",
-                    "fill_price",
-                    "notional",
-                    "fee",
-                    "realized_pnl",
-                    "cash_after",
-                    "position_after",
-                ]
-            )
-        return pd.DataFrame([asdict(trade) for trade in self.trades])
+        i = self._tr_i
+        return pd.DataFrame(
+            {
+                "timestamp": self._timestamps(self._tr_ts[:i]),
+                "side": np.where(self._tr_side[:i] == SIDE_BUY, "buy", "sell"),
+                "qty": self._tr_qty[:i],
+                "fill_price": self._tr_fill[:i],
+                "notional": self._tr_notional[:i],
+                "fee": self._tr_fee[:i],
+                "realized_pnl": self._tr_pnl[:i],
+                "cash_after": self._tr_cash[:i],
+                "position_after": self._tr_pos[:i],
+            }
+        )
 
     def equity_frame(self) -> pd.DataFrame:
-        if not self.equity_points:
-            return pd.DataFrame(columns=["timestamp", "equity", "cash", "position_qty", "close"])
-        return pd.DataFrame(self.equity_points)
+        i = self._eq_i
+        return pd.DataFrame(
+            {
+                "timestamp": self._timestamps(self._eq_ts[:i]),
+                "equity": self._eq_equity[:i],
+                "cash": self._eq_cash[:i],
+                "position_qty": self._eq_pos[:i],
+                "close": self._eq_close[:i],
+            }
+        )
 
@@ -5,6 +5,9 @@ from dataclasses import dataclass
 import pandas as pd
 
 
+_NS_PER_DAY = 86_400_000_000_000
+
+
 @dataclass
 class RiskConfig:
     max_position_pct: float = 1.0
@@ -21,15 +24,22 @@ class RiskManager:
             raise ValueError("max_position_pct must be in (0, 1]")
         if not (0 < self.config.max_daily_drawdown_pct < 1.0):
             raise ValueError("max_daily_drawdown_pct must be in (0, 1)")
+        self._max_pos = float(self.config.max_position_pct)
+        self._max_dd = float(self.config.max_daily_drawdown_pct)
+        self._min_notional = float(self.config.min_trade_notional)
 
-        self._current_day: pd.Timestamp | None = None
+        self._current_day: int | None = None
         self._day_start_equity: float | None = None
         self.guard_triggered = False
 
     def register_equity(self, timestamp: pd.Timestamp, equity: float) -> None:
-        bar_day = pd.Timestamp(timestamp).normalize()
-        if self._current_day is None or bar_day != self._current_day:
-            self._current_day = bar_day
+        bar_day = pd.Timestamp(timestamp).normalize().tz_localize(None)
+        self.register_equity_fast(bar_day.value // _NS_PER_DAY, equity)
+
+    def register_equity_fast(self, day_id: int, equity: float) -> None:
+        """Same as register_equity, keyed on an integer day id (local calendar days since epoch)."""
+        if day_id != self._current_day:
+            self._current_day = day_id
             self._day_start_equity = max(equity, 1e-9)
             self.guard_triggered = False
             return
@@ -37,7 +47,7 @@ class RiskManager:
         if self._day_start_equity is None:
             self._day_start_equity = max(equity, 1e-9)
         day_return = (equity / self._day_start_equity) - 1.0
-        if day_return <= -self.config.max_daily_drawdown_pct:
+        if day_return <= -self._max_dd:
             self.guard_triggered = True
 
     def can_add_risk(self) -> bool:
@@ -53,25 +63,14 @@ class RiskManager:
     ) -> float:
         if price <= 0 or cash <= 0 or equity <= 0:
             return 0.0
-        requested_fraction = max(0.0, min(1.0, requested_fraction))
-        if requested_fraction == 0:
-            return 0.0
-
-        max_position_notional = equity * self.config.max_position_pct
-        current_notional = current_position_qty * price
-        remaining_notional_capacity = max(0.0, max_position_notional - current_notional)
-        requested_notional = equity * requested_fraction
-
-        target_notional = min(requested_notional, remaining_notional_capacity, cash)
-        if target_notional < self.config.min_trade_notional:
+        fraction = max(0.0, min(1.0, requested_fraction))
+        capacity = max(0.0, equity * self._max_pos - current_position_qty * price)
+        target_notional = min(equity * fraction, capacity, cash)
+        if target_notional < self._min_notional:
             return 0.0
         return target_notional / price
 
     def size_sell_qty(self, requested_fraction: float, current_position_qty: float) -> float:
         if current_position_qty <= 0:
             return 0.0
-        requested_fraction = max(0.0, min(1.0, requested_fraction))
-        if requested_fraction == 0:
-            return 0.0
-        return current_position_qty * requested_fraction
-
+        return current_position_qty * max(0.0, min(1.0, requested_fraction))
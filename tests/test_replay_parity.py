@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.agents import RSIMeanReversionAgent, get_baseline_agents
+from engine.market_replay import _bar_arrays, load_ohlcv_csv, run_backtest, run_league, run_league_vec
+from engine.risk import RiskConfig, RiskManager
+
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "data" / "sample_ohlcv.csv"
+
+
+def _ohlcv(tz: str | None, n: int = 3_000) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.004, n)))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="h", tz=tz),
+            "open": close,
+            "high": close * 1.002,
+            "low": close * 0.998,
+            "close": close,
+            "volume": rng.integers(100, 1_000, n).astype(float),
+        }
+    )
+
+
+def _per_bar(factory, **kwargs):
+    """Same agent with compute_signals disabled, forcing the OrderEngine/RiskManager loop."""
+    return type(f"PerBar{factory.__name__}", (factory,), {"compute_signals": lambda self, data: None})(**kwargs)
+
+
+@pytest.mark.parametrize("tz", [None, "Asia/Seoul"])
+@pytest.mark.parametrize("max_position_pct", [1.0, 0.5])
+@pytest.mark.parametrize("strategy", list(get_baseline_agents()))
+def test_kernel_matches_per_bar_engine(strategy: str, max_position_pct: float, tz: str | None) -> None:
+    data = _ohlcv(tz)
+    factory = get_baseline_agents()[strategy]
+    risk_config = RiskConfig(max_position_pct=max_position_pct, max_daily_drawdown_pct=0.005)
+
+    kernel = run_backtest(data, factory(), initial_capital=10_000.0, risk_config=risk_config)
+    per_bar = run_backtest(data, _per_bar(factory), initial_capital=10_000.0, risk_config=risk_config)
+
+    assert len(kernel.trades) > 0
+    pd.testing.assert_frame_equal(kernel.trades, per_bar.trades, check_exact=True)
+    pd.testing.assert_frame_equal(kernel.equity_curve, per_bar.equity_curve, check_exact=True)
+    assert kernel.metrics == pytest.approx(per_bar.metrics, rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize("buy_size", [0.5, 0.3])
+def test_kernel_matches_per_bar_engine_with_fractional_sizes(buy_size: float) -> None:
+    data = _ohlcv("Asia/Seoul")
+
+    kernel = run_backtest(data, RSIMeanReversionAgent(buy_size=buy_size), initial_capital=10_000.0)
+    per_bar = run_backtest(data, _per_bar(RSIMeanReversionAgent, buy_size=buy_size), initial_capital=10_000.0)
+
+    assert len(kernel.trades) > 0
+    pd.testing.assert_frame_equal(kernel.trades, per_bar.trades, check_exact=True)
+    pd.testing.assert_frame_equal(kernel.equity_curve, per_bar.equity_curve, check_exact=True)
+
+
+@pytest.mark.parametrize("strategy", list(get_baseline_agents()))
+def test_kernel_matches_per_bar_engine_on_csv_prices(strategy: str) -> None:
+    data = load_ohlcv_csv(SAMPLE_CSV)
+    factory = get_baseline_agents()[strategy]
+
+    kernel = run_backtest(data, factory(), initial_capital=10_000.0)
+    per_bar = run_backtest(data, _per_bar(factory), initial_capital=10_000.0)
+
+    assert data["close"].dtype == np.float32
+    pd.testing.assert_frame_equal(kernel.trades, per_bar.trades, check_exact=True)
+    pd.testing.assert_frame_equal(kernel.equity_curve, per_bar.equity_curve, check_exact=True)
+
+
+@pytest.mark.parametrize("tz", [None, "Asia/Seoul"])
+@pytest.mark.parametrize("strategy", list(get_baseline_agents()))
+def test_empty_trades_keep_typed_columns(strategy: str, tz: str | None) -> None:
+    data = _ohlcv(tz, n=500)
+    factory = get_baseline_agents()[strategy]
+    risk_config = RiskConfig(min_trade_notional=20_000.0)
+
+    kernel = run_backtest(data, factory(), initial_capital=10_000.0, risk_config=risk_config)
+    per_bar = run_backtest(data, _per_bar(factory), initial_capital=10_000.0, risk_config=risk_config)
+
+    assert per_bar.trades.empty
+    assert per_bar.trades["timestamp"].dtype == per_bar.equity_curve["timestamp"].dtype
+    assert per_bar.trades["qty"].dtype == np.float64
+    pd.testing.assert_frame_equal(kernel.trades, per_bar.trades, check_exact=True)
+
+
+def test_day_ids_split_at_local_midnight() -> None:
+    data = _ohlcv("Asia/Seoul", n=96)
+    _, _, day_id = _bar_arrays(data)
+
+    local_day = data["timestamp"].dt.normalize()
+    assert np.array_equal(np.diff(day_id) != 0, (local_day != local_day.shift()).to_numpy()[1:])
+
+
+@pytest.mark.parametrize("tz", [None, "Asia/Seoul"])
+def test_register_equity_uses_bar_array_day_ids(tz: str | None) -> None:
+    data = _ohlcv(tz, n=96)
+    _, _, day_id = _bar_arrays(data)
+
+    risk_manager = RiskManager()
+    seen = []
+    for timestamp in data["timestamp"]:
+        risk_manager.register_equity(timestamp, 10_000.0)
+        seen.append(risk_manager._current_day)
+    np.testing.assert_array_equal(seen, day_id)
+
+
+def test_run_league_vec_matches_run_league() -> None:
+    data = _ohlcv("Asia/Seoul")
+    risk_config = RiskConfig(max_daily_drawdown_pct=0.005)
+
+    batched = run_league_vec(data, get_baseline_agents(), risk_config=risk_config)
+    serial = run_league(data=data, risk_config=risk_config)
+
+    pd.testing.assert_frame_equal(batched.leaderboard, serial.leaderboard, check_exact=True)
+    for strategy, result in serial.backtests.items():
+        pd.testing.assert_frame_equal(batched.backtests[strategy].trades, result.trades, check_exact=True)
+        pd.testing.assert_frame_equal(batched.backtests[strategy].equity_curve, result.equity_curve, check_exact=True)
+
+
+def test_run_league_vec_rejects_empty_agents() -> None:
+    with pytest.raises(ValueError, match="at least one strategy"):
+        run_league_vec(_ohlcv(None, n=10), {})
+
+
+@pytest.mark.parametrize("strategy", list(get_baseline_agents()))
+def test_compute_signals_follows_its_data_argument(strategy: str) -> None:
+    short, full = _ohlcv(None, n=90), _ohlcv(None)
+    agent = get_baseline_agents()[strategy]()
+    agent.prepare(short)
+
+    signals, sizes = agent.compute_signals(full)
+    expected_signals, expected_sizes = get_baseline_agents()[strategy]().compute_signals(full)
+
+    assert len(signals) == len(full)
+    np.testing.assert_array_equal(signals, expected_signals)
+    np.testing.assert_array_equal(sizes, expected_sizes)